@@ -3,9 +3,16 @@ Multi-Agent Customer Care Backend (Lab 2)
 Flask API that uses CrewAI multi-agent system
 """
 
+import hmac
+import os
+
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from crew_optimized import process_customer_inquiry  # OPTIMIZED VERSION
+from crew import process_customer_inquiry as process_with_full_crew
+from crew_optimized import process_customer_inquiry as process_with_optimized_crew
+from crew_optimized import process_template_inquiry
+from deadline import RequestBudget, TIMEOUT_HEADER, parse_timeout
+from mode_controller import FULL_TIER_TIMEOUT_SECONDS, mode_controller
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
@@ -14,12 +21,27 @@ CORS(app)  # Enable CORS for React frontend
 # In production, use Redis or database
 conversation_sessions = {}
 
+# Handler for each load tier picked by the mode controller
+TIER_HANDLERS = {
+    "full": process_with_full_crew,
+    "optimized": process_with_optimized_crew,
+    "template": process_template_inquiry
+}
+
 
 @app.route('/api/chat', methods=['POST'])
 def chat():
     """
     Handle customer messages using multi-agent crew
+
+    Clients can send an X-Request-Timeout header (seconds) to set the
+    deadline; otherwise REQUEST_TIMEOUT_SECONDS is used, or
+    TIER_FULL_TIMEOUT_SECONDS when the request runs on the full crew.
     """
+    # Start the clock as soon as the request arrives
+    client_timeout = request.headers.get(TIMEOUT_HEADER)
+    budget = RequestBudget(parse_timeout(client_timeout))
+
     try:
         data = request.json
         user_message = data.get('message', '')
@@ -45,10 +67,31 @@ def chat():
         print(f"Processing customer inquiry: {user_message}")
         print(f"{'='*60}\n")
         
-        result = process_customer_inquiry(user_message, conversation_history)
+        # Pick full crew / optimized crew / template answer based on load
+        client_remaining = budget.remaining() if client_timeout is not None else None
+        tier, tier_reason = mode_controller.choose_tier(client_remaining)
+        if tier == 'full' and client_timeout is None:
+            # The full crew can't fit the default deadline; it gets its own
+            budget.extend(FULL_TIER_TIMEOUT_SECONDS)
+        print(f"Tier: {tier} ({tier_reason})")
+
+        rate_limited = False
+        timed_out = False
+        try:
+            result = TIER_HANDLERS[tier](user_message, conversation_history, budget=budget)
+            result_metadata = result.get('metadata', {})
+            error = result_metadata.get('error', '').lower()
+            rate_limited = 'ratelimit' in error or 'rate limit' in error
+            timed_out = result_metadata.get('status') == 'partial'
+        finally:
+            mode_controller.request_finished(
+                tier, budget.elapsed_ms() / 1000, rate_limited, timed_out
+            )
         
         response_text = result['response']
         metadata = result.get('metadata', {})
+        metadata['tier'] = tier
+        metadata['tier_reason'] = tier_reason
         
         # Add assistant response to history
         conversation_history.append({
@@ -84,6 +127,35 @@ def health():
     })
 
 
+@app.route('/api/admin/tier', methods=['GET', 'POST'])
+def admin_tier():
+    """
+    Show the current load tier, or pin one with {"tier": "full"}
+
+    Send {"tier": null} or {"tier": "auto"} to return to automatic mode.
+    Requests must send ADMIN_TOKEN in X-Admin-Token; the endpoint is
+    disabled while ADMIN_TOKEN is unset.
+    """
+    admin_token = os.getenv('ADMIN_TOKEN')
+    if not admin_token:
+        return jsonify({'error': 'admin endpoint disabled (ADMIN_TOKEN not set)'}), 403
+    sent_token = request.headers.get('X-Admin-Token', '')
+    if not hmac.compare_digest(sent_token.encode(), admin_token.encode()):
+        return jsonify({'error': 'unauthorized'}), 401
+
+    if request.method == 'POST':
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or 'tier' not in data:
+            return jsonify({'error': "missing 'tier' (use a tier name, 'auto' or null)"}), 400
+        tier = data['tier']
+        try:
+            mode_controller.pin(None if tier == 'auto' else tier)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    return jsonify(mode_controller.status())
+
+
 @app.route('/api/reset', methods=['POST'])
 def reset_session():
     """Reset conversation history for a session"""
@@ -4,27 +4,31 @@ Orchestrates the team of agents to handle customer inquiries
 """
 
 from crewai import Crew, Task, Process
-from agents import (
-    greeter_agent,
-    researcher_agent,
-    order_specialist_agent,
-    resolver_agent,
-    quality_reviewer_agent,
-    supervisor_agent
-)
+from agents import create_agents
+from deadline import DeadlineExceeded, RequestBudget, run_with_budget
+from tools import partial_answer
 
 
-def create_customer_care_crew(user_message: str, conversation_history: list = None):
+def create_customer_care_crew(user_message: str, conversation_history: list = None,
+                              budget: RequestBudget = None):
     """
     Create a crew to handle a customer inquiry
     
     Args:
         user_message: The customer's message
         conversation_history: Previous messages in the conversation
+        budget: Deadline and tool-call budget the agents should respect
         
     Returns:
         Configured Crew ready to process the inquiry
     """
+    agents = create_agents(budget)
+    greeter_agent = agents["greeter"]
+    researcher_agent = agents["researcher"]
+    order_specialist_agent = agents["order_specialist"]
+    resolver_agent = agents["resolver"]
+    quality_reviewer_agent = agents["quality_reviewer"]
+    supervisor_agent = agents["supervisor"]
     
     # Build context from conversation history
     context = ""
@@ -148,21 +152,27 @@ def create_customer_care_crew(user_message: str, conversation_history: list = No
     return crew
 
 
-def process_customer_inquiry(user_message: str, conversation_history: list = None) -> dict:
+def process_customer_inquiry(user_message: str, conversation_history: list = None,
+                             budget: RequestBudget = None) -> dict:
     """
     Process a customer inquiry using the multi-agent crew
     
     Args:
         user_message: The customer's message
         conversation_history: Previous conversation messages
+        budget: Deadline and tool-call budget for this request
+            (defaults to REQUEST_TIMEOUT_SECONDS from the environment)
         
     Returns:
         dict with 'response' and 'metadata' about the agents' work
     """
+    if budget is None:
+        budget = RequestBudget()
+
     try:
         # Create and run the crew
-        crew = create_customer_care_crew(user_message, conversation_history)
-        result = crew.kickoff()
+        crew = create_customer_care_crew(user_message, conversation_history, budget)
+        result = run_with_budget(crew.kickoff, budget)
         
         # Extract the final response (from quality review task)
         final_response = str(result)
@@ -171,7 +181,21 @@ def process_customer_inquiry(user_message: str, conversation_history: list = Non
             "response": final_response,
             "metadata": {
                 "agents_involved": ["greeter", "researcher", "order_specialist", "resolver", "quality_reviewer"],
-                "status": "success"
+                "status": "success",
+                "elapsed_ms": budget.elapsed_ms(),
+                "tool_calls": budget.tool_calls_snapshot()
+            }
+        }
+
+    except DeadlineExceeded as e:
+        # Out of time: answer with whatever the tools already found
+        return {
+            "response": partial_answer(user_message, budget),
+            "metadata": {
+                "status": "partial",
+                "reason": str(e),
+                "elapsed_ms": budget.elapsed_ms(),
+                "tool_calls": budget.tool_calls_snapshot()
             }
         }
         
@@ -11,13 +11,19 @@ For complex queries, the full 6-agent crew (crew.py) can be used.
 """
 
 from crewai import Crew, Task, Process
-from agents import researcher_agent, order_specialist_agent, quality_reviewer_agent
+from agents import create_agents
+from deadline import DeadlineExceeded, RequestBudget, run_with_budget
+from tools import answer_from_tools, find_order_number, partial_answer
 
 
-def create_simple_faq_crew(user_message: str):
+def create_simple_faq_crew(user_message: str, budget: RequestBudget = None):
     """
     Simple 2-agent crew for FAQ queries (FAST!)
     """
+    agents = create_agents(budget)
+    researcher_agent = agents["researcher"]
+    quality_reviewer_agent = agents["quality_reviewer"]
+
     # Task 1: Get FAQ answer
     research_task = Task(
         description=f"""Search the FAQ for: {user_message}
@@ -56,10 +62,14 @@ def create_simple_faq_crew(user_message: str):
     return crew
 
 
-def create_order_crew(user_message: str):
+def create_order_crew(user_message: str, budget: RequestBudget = None):
     """
     2-agent crew for order queries
     """
+    agents = create_agents(budget)
+    order_specialist_agent = agents["order_specialist"]
+    quality_reviewer_agent = agents["quality_reviewer"]
+
     order_task = Task(
         description=f"""Extract order number and look it up: {user_message}
         
@@ -94,8 +104,7 @@ def route_query(user_message: str) -> str:
     msg_lower = user_message.lower()
     
     # Check for order number patterns
-    import re
-    if re.search(r'\b\d{5}\b', user_message) or 'order' in msg_lower:
+    if find_order_number(user_message) or 'order' in msg_lower:
         return 'order'
     
     # Check for FAQ keywords
@@ -107,21 +116,40 @@ def route_query(user_message: str) -> str:
     return 'faq'
 
 
-def process_customer_inquiry(user_message: str, conversation_history: list = None) -> dict:
+def process_template_inquiry(user_message: str, conversation_history: list = None,
+                             budget: RequestBudget = None) -> dict:
+    """
+    OVERLOAD MODE: Answer straight from the tools, no agents at all
+    """
+    return {
+        "response": answer_from_tools(user_message),
+        "metadata": {
+            "query_type": route_query(user_message),
+            "agents_used": 0,
+            "status": "success"
+        }
+    }
+
+
+def process_customer_inquiry(user_message: str, conversation_history: list = None,
+                             budget: RequestBudget = None) -> dict:
     """
     OPTIMIZED: Route to the right crew for faster responses
     """
+    if budget is None:
+        budget = RequestBudget()
+
+    # Fast routing
+    query_type = route_query(user_message)
+
     try:
-        # Fast routing
-        query_type = route_query(user_message)
-        
         # Use minimal crew
         if query_type == 'order':
-            crew = create_order_crew(user_message)
+            crew = create_order_crew(user_message, budget)
         else:  # faq
-            crew = create_simple_faq_crew(user_message)
+            crew = create_simple_faq_crew(user_message, budget)
         
-        result = crew.kickoff()
+        result = run_with_budget(crew.kickoff, budget)
         final_response = str(result)
         
         return {
@@ -129,7 +157,22 @@ def process_customer_inquiry(user_message: str, conversation_history: list = Non
             "metadata": {
                 "query_type": query_type,
                 "agents_used": 2,  # Much faster!
-                "status": "success"
+                "status": "success",
+                "elapsed_ms": budget.elapsed_ms(),
+                "tool_calls": budget.tool_calls_snapshot()
+            }
+        }
+
+    except DeadlineExceeded as e:
+        # Out of time: answer with whatever the tools already found
+        return {
+            "response": partial_answer(user_message, budget),
+            "metadata": {
+                "query_type": query_type,
+                "status": "partial",
+                "reason": str(e),
+                "elapsed_ms": budget.elapsed_ms(),
+                "tool_calls": budget.tool_calls_snapshot()
             }
         }
         
@@ -0,0 +1,198 @@
+"""
+Request deadlines and execution budgets
+Bounds how long and how much work a single customer inquiry may consume
+"""
+
+# Standard library
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+# ============================================================
+# Configuration
+# ============================================================
+# Default deadline for a request when the client doesn't send one.
+# Our tail latency SLO is p99 < 5s, so this is the ceiling by default.
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("REQUEST_TIMEOUT_SECONDS", "5"))
+
+# Clients may ask for a shorter or longer deadline, but never above this
+MAX_TIMEOUT_SECONDS = float(os.getenv("REQUEST_TIMEOUT_MAX_SECONDS", "30"))
+
+# How many times a single tool may be called per request.
+# Each agent owns its own tool, so this is effectively a per-agent limit.
+MAX_TOOL_CALLS = int(os.getenv("AGENT_MAX_TOOL_CALLS", "2"))
+
+# HTTP header clients use to send their deadline (in seconds)
+TIMEOUT_HEADER = "X-Request-Timeout"
+
+# Worker threads that run crews so the request thread can stop waiting
+CREW_WORKERS = int(os.getenv("CREW_WORKERS", "4"))
+_executor = ThreadPoolExecutor(max_workers=CREW_WORKERS, thread_name_prefix="crew")
+
+# Crews submitted but not started yet, and crews running on a worker.
+# A crew keeps its worker until it actually returns, even after its
+# request has timed out, so these reflect real pool load.
+_worker_lock = threading.Lock()
+_pending_crews = 0
+_busy_crews = 0
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request runs past its deadline or is cancelled"""
+
+
+class RequestBudget:
+    """
+    Deadline and tool-call budget for one customer inquiry
+
+    Created when the HTTP request arrives so that time spent queueing
+    counts against the deadline, then handed explicitly to the tools,
+    agents and LLM that work on the inquiry. Tool bookkeeping is guarded
+    by a lock because crew threads update it while the request thread
+    may be reading it.
+    """
+
+    def __init__(self, timeout_seconds: float = None, max_tool_calls: int = MAX_TOOL_CALLS):
+        if timeout_seconds is None:
+            timeout_seconds = DEFAULT_TIMEOUT_SECONDS
+        self.timeout_seconds = timeout_seconds
+        self.max_tool_calls = max_tool_calls
+        self.started_at = time.monotonic()
+        self.deadline = self.started_at + timeout_seconds
+        self.cancelled = False
+        self._tool_calls = {}
+        self._tool_results = []
+        self._lock = threading.Lock()
+
+    def extend(self, timeout_seconds: float):
+        """Move the deadline to timeout_seconds after arrival (never earlier)"""
+        if timeout_seconds > self.timeout_seconds:
+            self.timeout_seconds = timeout_seconds
+            self.deadline = self.started_at + timeout_seconds
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)"""
+        return max(0.0, self.deadline - time.monotonic())
+
+    def elapsed_ms(self) -> int:
+        """Milliseconds since the request arrived"""
+        return int((time.monotonic() - self.started_at) * 1000)
+
+    def expired(self) -> bool:
+        """True once the deadline has passed or the request was cancelled"""
+        return self.cancelled or time.monotonic() >= self.deadline
+
+    def check(self):
+        """Raise DeadlineExceeded if no more work should be done"""
+        if self.expired():
+            raise DeadlineExceeded(f"Request deadline of {self.timeout_seconds}s exceeded")
+
+    def cancel(self):
+        """Tell in-flight work to stop at its next checkpoint"""
+        self.cancelled = True
+
+    def llm_timeout(self, cap: float) -> float:
+        """Timeout for the next LLM call: what's left of the deadline, at most cap"""
+        return max(0.1, min(cap, self.remaining()))
+
+    def allow_tool_call(self, tool_name: str) -> bool:
+        """Count a tool call; False if the deadline or the tool's limit is hit"""
+        if self.expired():
+            return False
+        with self._lock:
+            calls = self._tool_calls.get(tool_name, 0)
+            if calls >= self.max_tool_calls:
+                return False
+            self._tool_calls[tool_name] = calls + 1
+            return True
+
+    def record_tool_result(self, tool_name: str, result: str):
+        """Keep tool output around so it can be returned as a partial answer"""
+        with self._lock:
+            self._tool_results.append((tool_name, result))
+
+    def tool_calls_snapshot(self) -> dict:
+        """Copy of the per-tool call counts (safe to serialise)"""
+        with self._lock:
+            return dict(self._tool_calls)
+
+    def tool_results_snapshot(self) -> list:
+        """Copy of the (tool_name, result) pairs recorded so far, oldest first"""
+        with self._lock:
+            return list(self._tool_results)
+
+
+def parse_timeout(value) -> float:
+    """
+    Turn a client-supplied timeout (header or config value) into seconds
+
+    Falls back to the default for missing, invalid, non-finite (nan/inf)
+    or non-positive values and clamps to MAX_TIMEOUT_SECONDS.
+    """
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        return DEFAULT_TIMEOUT_SECONDS
+    if not math.isfinite(seconds) or seconds <= 0:
+        return DEFAULT_TIMEOUT_SECONDS
+    return min(seconds, MAX_TIMEOUT_SECONDS)
+
+
+def make_step_callback(budget: RequestBudget, llm=None, llm_timeout_cap: float = MAX_TIMEOUT_SECONDS):
+    """
+    Agent step callback that cancels the crew once the deadline passes
+
+    CrewAI calls this after every agent step, so raising here stops the
+    agent loop instead of letting it keep calling the LLM. When given the
+    request's own LLM, it also shrinks that LLM's timeout to what's left
+    of the deadline so the next call can't run past it.
+    """
+    def _step_callback(_step_output=None):
+        budget.check()
+        if llm is not None:
+            llm.timeout = budget.llm_timeout(llm_timeout_cap)
+
+    return _step_callback
+
+
+def worker_stats() -> dict:
+    """Crews waiting for a worker ('pending') and currently running ('busy')"""
+    with _worker_lock:
+        return {"pending": _pending_crews, "busy": _busy_crews}
+
+
+def _run_tracked(fn):
+    global _pending_crews, _busy_crews
+    with _worker_lock:
+        _pending_crews -= 1
+        _busy_crews += 1
+    try:
+        return fn()
+    finally:
+        with _worker_lock:
+            _busy_crews -= 1
+
+
+def run_with_budget(fn, budget: RequestBudget):
+    """
+    Run fn() in a worker thread, waiting at most until the budget's deadline
+
+    On timeout the budget is cancelled so the worker stops at its next
+    step callback, and DeadlineExceeded is raised to the caller.
+    """
+    global _pending_crews
+    budget.check()
+    with _worker_lock:
+        _pending_crews += 1
+    future = _executor.submit(_run_tracked, fn)
+    try:
+        return future.result(timeout=budget.remaining())
+    except FutureTimeoutError:
+        budget.cancel()
+        if future.cancel():
+            # Never started, so _run_tracked won't decrement it
+            with _worker_lock:
+                _pending_crews -= 1
+        raise DeadlineExceeded(f"Request deadline of {budget.timeout_seconds}s exceeded")
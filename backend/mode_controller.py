@@ -0,0 +1,279 @@
+"""
+Load-Adaptive Mode Controller
+Picks how much of the agent team to use for each request based on load
+
+Tiers (richest first):
+- full:      6-agent crew (crew.py) when the system is idle
+- optimized: 2-agent crew (crew_optimized.py) under moderate load
+- template:  deterministic tool-only answers (no LLM) under overload
+
+Degrading to a cheaper tier happens immediately. Recovering to a richer
+tier happens one step per TIER_COOLDOWN_SECONDS during which load stayed
+below the recovery thresholds (tighter than the degrade thresholds).
+Load is sampled whenever a request arrives; time with no requests counts
+as calm, so after a long enough quiet spell the next request goes
+straight back to the full crew.
+
+The full crew runs five sequential tasks and can't finish inside the
+default 5s deadline. Requests without a client deadline get
+TIER_FULL_TIMEOUT_SECONDS when they run on it; requests whose client
+deadline is under TIER_FULL_MIN_SECONDS get the optimized crew instead.
+"""
+
+# Standard library
+import os
+import threading
+import time
+from collections import deque
+
+from deadline import worker_stats
+
+# ============================================================
+# Configuration
+# ============================================================
+TIERS = ["full", "optimized", "template"]  # Richest to cheapest
+
+# Rough LLM calls per request for each tier (sequential tasks + tool loops)
+ESTIMATED_LLM_CALLS = {"full": 10, "optimized": 4, "template": 0}
+
+# Groq free tier: 30 requests per minute
+GROQ_RPM_LIMIT = int(os.getenv("GROQ_RPM_LIMIT", "30"))
+
+# Thresholds for degrading to a cheaper tier
+MODERATE_IN_FLIGHT = int(os.getenv("TIER_MODERATE_IN_FLIGHT", "2"))
+MODERATE_LATENCY_SECONDS = float(os.getenv("TIER_MODERATE_LATENCY_SECONDS", "2.5"))
+MODERATE_HEADROOM = float(os.getenv("TIER_MODERATE_HEADROOM", "0.5"))
+MODERATE_TIMEOUT_RATE = float(os.getenv("TIER_MODERATE_TIMEOUT_RATE", "0.2"))
+OVERLOAD_QUEUE_DEPTH = int(os.getenv("TIER_OVERLOAD_QUEUE_DEPTH", "2"))
+OVERLOAD_LATENCY_SECONDS = float(os.getenv("TIER_OVERLOAD_LATENCY_SECONDS", "4.5"))
+OVERLOAD_HEADROOM = float(os.getenv("TIER_OVERLOAD_HEADROOM", "0.15"))
+OVERLOAD_TIMEOUT_RATE = float(os.getenv("TIER_OVERLOAD_TIMEOUT_RATE", "0.5"))
+
+# Recovery needs load well below the degrade thresholds (hysteresis band)
+RECOVERY_FACTOR = float(os.getenv("TIER_RECOVERY_FACTOR", "0.7"))
+
+# How long load must stay calm before stepping back up to a richer tier
+TIER_COOLDOWN_SECONDS = float(os.getenv("TIER_COOLDOWN_SECONDS", "30"))
+
+# Minimum client deadline for the full crew to be used
+FULL_TIER_MIN_SECONDS = float(os.getenv("TIER_FULL_MIN_SECONDS", "15"))
+
+# Deadline for full-crew requests that didn't send their own
+FULL_TIER_TIMEOUT_SECONDS = float(os.getenv("TIER_FULL_TIMEOUT_SECONDS", "20"))
+
+# Request outcomes older than this no longer count towards any signal
+SIGNAL_WINDOW_SECONDS = float(os.getenv("TIER_SIGNAL_WINDOW_SECONDS", "60"))
+
+# Number of recent requests used for the latency signal
+LATENCY_WINDOW = 20
+
+# Finished crew requests needed before the timeout rate is trusted
+TIMEOUT_RATE_MIN_SAMPLES = 3
+
+# How long a Groq rate-limit error forces headroom to zero
+RATE_LIMIT_BACKOFF_SECONDS = 60
+
+
+class ModeController:
+    """
+    Tracks load signals and chooses a tier for each incoming request
+
+    Signals:
+    - queue_depth: crews submitted to the crew pool but not started yet
+    - in_flight_llm: crews running on a worker (tasks are sequential, so
+      each running crew has at most one LLM call in flight). Crews whose
+      request already timed out still count until they actually stop.
+    - p95_latency: 95th percentile latency of recent optimized-crew
+      requests that finished in time. The optimized crew runs under the
+      SLO deadline; the full crew is slow by design and would skew it.
+    - timeout_rate: share of recent crew requests cut off by their deadline
+    - headroom: share of the Groq per-minute budget still unused
+
+    Latency and timeout samples age out after SIGNAL_WINDOW_SECONDS.
+
+    Args:
+        stats: callable returning {"pending": int, "busy": int} for the
+            crew pool (defaults to deadline.worker_stats)
+        clock: monotonic clock in seconds (defaults to time.monotonic)
+    """
+
+    def __init__(self, stats=worker_stats, clock=time.monotonic):
+        self._stats = stats
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes = deque()  # (timestamp, tier, latency, timed_out)
+        self._timeouts = 0
+        self._llm_calls = deque()  # Timestamps of estimated LLM calls
+        self._rate_limited_until = 0.0
+        self._tier = "full"  # Tier the load calls for
+        self._served = "full"  # Tier the last request actually ran on
+        self._last_busy_at = clock()  # Last sample too busy to recover
+        self._pinned = None
+
+    # --------------------------------------------------------
+    # Signals
+    # --------------------------------------------------------
+    def _signals(self, now: float) -> dict:
+        while self._llm_calls and now - self._llm_calls[0] > 60:
+            self._llm_calls.popleft()
+        while self._outcomes and now - self._outcomes[0][0] > SIGNAL_WINDOW_SECONDS:
+            self._outcomes.popleft()
+
+        if now < self._rate_limited_until:
+            headroom = 0.0
+        else:
+            headroom = max(0.0, 1 - len(self._llm_calls) / GROQ_RPM_LIMIT)
+
+        latencies = sorted([
+            latency for _, tier, latency, timed_out in self._outcomes
+            if tier == "optimized" and not timed_out
+        ][-LATENCY_WINDOW:])
+        p95_latency = latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0
+
+        crew_outcomes = [timed_out for _, tier, _, timed_out in self._outcomes if tier != "template"]
+        timeout_rate = 0.0
+        if len(crew_outcomes) >= TIMEOUT_RATE_MIN_SAMPLES:
+            timeout_rate = sum(crew_outcomes) / len(crew_outcomes)
+
+        stats = self._stats()
+        return {
+            "queue_depth": stats["pending"],
+            "in_flight_llm": stats["busy"],
+            "p95_latency": round(p95_latency, 3),
+            "timeout_rate": round(timeout_rate, 3),
+            "headroom": round(headroom, 3)
+        }
+
+    def _target_tier(self, signals: dict, factor: float = 1.0):
+        """
+        Cheapest tier any signal calls for, with the reason
+
+        factor < 1 tightens every threshold, used when deciding recovery.
+        """
+        if signals["queue_depth"] >= OVERLOAD_QUEUE_DEPTH * factor:
+            return "template", f"queue depth {signals['queue_depth']}"
+        if signals["p95_latency"] >= OVERLOAD_LATENCY_SECONDS * factor:
+            return "template", f"p95 latency {signals['p95_latency']}s"
+        if signals["timeout_rate"] >= OVERLOAD_TIMEOUT_RATE * factor:
+            return "template", f"timeout rate {signals['timeout_rate']}"
+        if signals["headroom"] <= OVERLOAD_HEADROOM / factor:
+            return "template", f"rate-limit headroom {signals['headroom']}"
+
+        if signals["in_flight_llm"] >= MODERATE_IN_FLIGHT * factor:
+            return "optimized", f"{signals['in_flight_llm']} crew(s) in flight"
+        if signals["p95_latency"] >= MODERATE_LATENCY_SECONDS * factor:
+            return "optimized", f"p95 latency {signals['p95_latency']}s"
+        if signals["timeout_rate"] >= MODERATE_TIMEOUT_RATE * factor:
+            return "optimized", f"timeout rate {signals['timeout_rate']}"
+        if signals["headroom"] <= MODERATE_HEADROOM / factor:
+            return "optimized", f"rate-limit headroom {signals['headroom']}"
+
+        return "full", "idle"
+
+    # --------------------------------------------------------
+    # Tier selection
+    # --------------------------------------------------------
+    def choose_tier(self, remaining_seconds: float = None):
+        """
+        Pick the tier for a new request
+
+        Args:
+            remaining_seconds: time left on the client's deadline (None if
+                the client didn't send one); the full crew is skipped if
+                it's under TIER_FULL_MIN_SECONDS
+
+        Returns:
+            (tier, reason) tuple; call request_finished() when done
+        """
+        with self._lock:
+            now = self._clock()
+            signals = self._signals(now)
+
+            if self._pinned:
+                tier, reason = self._pinned, "pinned by admin"
+            else:
+                tier, reason = self._next_tier(signals, now)
+                if (tier == "full" and remaining_seconds is not None
+                        and remaining_seconds < FULL_TIER_MIN_SECONDS):
+                    tier = "optimized"
+                    reason = f"deadline {remaining_seconds:.1f}s too short for full crew"
+
+            self._served = tier
+            self._llm_calls.extend([now] * ESTIMATED_LLM_CALLS[tier])
+            return tier, reason
+
+    def _next_tier(self, signals: dict, now: float):
+        current = TIERS.index(self._tier)
+        target_tier, reason = self._target_tier(signals)
+
+        # Degrade right away
+        if TIERS.index(target_tier) > current:
+            self._tier, self._last_busy_at = target_tier, now
+            return self._tier, f"degraded: {reason}"
+
+        # Not calm enough to recover: the calm period starts over
+        recovery_tier, recovery_reason = self._target_tier(signals, RECOVERY_FACTOR)
+        recovery = TIERS.index(recovery_tier)
+        if recovery >= current:
+            self._last_busy_at = now
+            if TIERS.index(target_tier) < current:
+                return self._tier, f"holding: {recovery_reason}"
+            return self._tier, reason
+
+        # Calm: one step up per full cooldown since the last busy sample
+        steps = int((now - self._last_busy_at) // TIER_COOLDOWN_SECONDS)
+        if steps == 0:
+            return self._tier, "holding during cooldown"
+
+        new = max(recovery, current - steps)
+        self._last_busy_at += (current - new) * TIER_COOLDOWN_SECONDS
+        self._tier = TIERS[new]
+        return self._tier, f"recovered: {recovery_reason}"
+
+    def request_finished(self, tier: str, latency_seconds: float,
+                         rate_limited: bool = False, timed_out: bool = False):
+        """
+        Record the outcome of a request started with choose_tier()
+
+        Requests cut off by their deadline count towards the timeout rate
+        rather than the latency signal: their latency is the deadline.
+        """
+        with self._lock:
+            now = self._clock()
+            if timed_out:
+                self._timeouts += 1
+            self._outcomes.append((now, tier, latency_seconds, timed_out))
+            if rate_limited:
+                self._rate_limited_until = now + RATE_LIMIT_BACKOFF_SECONDS
+
+    # --------------------------------------------------------
+    # Admin
+    # --------------------------------------------------------
+    def pin(self, tier):
+        """Force every request onto one tier; None returns to automatic mode"""
+        if tier is not None and tier not in TIERS:
+            raise ValueError(f"Unknown tier '{tier}'. Choose from: {', '.join(TIERS)}")
+        with self._lock:
+            self._pinned = tier
+
+    def status(self) -> dict:
+        """
+        Tier being served, pin and load signals (for the admin endpoint)
+
+        'tier' is what requests are actually running on: the pinned tier,
+        or else the tier the last request got. 'load_tier' is what load
+        alone calls for; it is richer when a short client deadline capped
+        the last request or a cheaper tier is pinned.
+        """
+        with self._lock:
+            return {
+                "tier": self._pinned or self._served,
+                "load_tier": self._tier,
+                "pinned": self._pinned,
+                "timeouts": self._timeouts,
+                "signals": self._signals(self._clock())
+            }
+
+
+# Shared controller for the Flask app
+mode_controller = ModeController()
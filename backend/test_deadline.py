@@ -0,0 +1,115 @@
+"""
+Tests for request deadlines and budgets
+Run from backend/: python -m pytest -q
+"""
+
+import threading
+import time
+
+import pytest
+
+from deadline import (
+    DEFAULT_TIMEOUT_SECONDS,
+    MAX_TIMEOUT_SECONDS,
+    DeadlineExceeded,
+    RequestBudget,
+    make_step_callback,
+    parse_timeout,
+    run_with_budget,
+    worker_stats,
+)
+
+
+@pytest.mark.parametrize("value", [None, "", "abc", "0", "-3", "nan", "inf", "-inf"])
+def test_parse_timeout_falls_back_to_default(value):
+    assert parse_timeout(value) == DEFAULT_TIMEOUT_SECONDS
+
+
+def test_parse_timeout_accepts_and_clamps():
+    assert parse_timeout("1.5") == 1.5
+    assert parse_timeout(str(MAX_TIMEOUT_SECONDS * 10)) == MAX_TIMEOUT_SECONDS
+
+
+def test_tool_call_limit_is_per_tool():
+    budget = RequestBudget(5, max_tool_calls=2)
+    assert budget.allow_tool_call("FAQ Search Tool")
+    assert budget.allow_tool_call("FAQ Search Tool")
+    assert not budget.allow_tool_call("FAQ Search Tool")
+    assert budget.allow_tool_call("Order Lookup Tool")
+    assert budget.tool_calls_snapshot() == {"FAQ Search Tool": 2, "Order Lookup Tool": 1}
+
+
+def test_no_tool_calls_after_deadline():
+    budget = RequestBudget(5)
+    budget.cancel()
+    assert not budget.allow_tool_call("FAQ Search Tool")
+
+
+def test_snapshots_are_copies():
+    budget = RequestBudget(5)
+    budget.allow_tool_call("FAQ Search Tool")
+    budget.record_tool_result("FAQ Search Tool", "answer")
+    budget.tool_calls_snapshot()["FAQ Search Tool"] = 99
+    budget.tool_results_snapshot().clear()
+    assert budget.tool_calls_snapshot() == {"FAQ Search Tool": 1}
+    assert budget.tool_results_snapshot() == [("FAQ Search Tool", "answer")]
+
+
+def test_extend_only_moves_deadline_later():
+    budget = RequestBudget(5)
+    budget.extend(20)
+    assert budget.timeout_seconds == 20
+    assert budget.remaining() > 15
+    budget.extend(1)
+    assert budget.timeout_seconds == 20
+
+
+def test_llm_timeout_follows_remaining_time():
+    assert RequestBudget(30).llm_timeout(4) == 4
+    assert RequestBudget(1).llm_timeout(4) <= 1
+
+
+def test_run_with_budget_returns_result():
+    assert run_with_budget(lambda: "done", RequestBudget(5)) == "done"
+
+
+def test_run_with_budget_times_out_and_cancels():
+    budget = RequestBudget(0.1)
+    release = threading.Event()
+
+    with pytest.raises(DeadlineExceeded):
+        run_with_budget(lambda: release.wait(5), budget)
+
+    assert budget.cancelled
+    assert budget.expired()
+    # The worker is still busy until the crew actually returns
+    assert worker_stats()["busy"] == 1
+    release.set()
+    for _ in range(50):
+        if worker_stats()["busy"] == 0:
+            break
+        time.sleep(0.01)
+    assert worker_stats() == {"pending": 0, "busy": 0}
+
+
+def test_run_with_budget_refuses_expired_budget():
+    budget = RequestBudget(5)
+    budget.cancel()
+    with pytest.raises(DeadlineExceeded):
+        run_with_budget(lambda: "never", budget)
+
+
+def test_step_callback_stops_work_and_shrinks_llm_timeout():
+    class FakeLLM:
+        timeout = 4
+
+    budget = RequestBudget(1)
+    llm = FakeLLM()
+    step_callback = make_step_callback(budget, llm, 4)
+
+    step_callback()
+    assert llm.timeout <= 1
+
+    budget.cancel()
+    with pytest.raises(DeadlineExceeded):
+        step_callback()
@@ -0,0 +1,167 @@
+"""
+Tests for the load-adaptive mode controller
+Run from backend/: python -m pytest -q
+"""
+
+import pytest
+
+from mode_controller import ModeController, TIER_COOLDOWN_SECONDS
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeStats:
+    def __init__(self):
+        self.pending = 0
+        self.busy = 0
+
+    def __call__(self):
+        return {"pending": self.pending, "busy": self.busy}
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def stats():
+    return FakeStats()
+
+
+@pytest.fixture
+def controller(clock, stats):
+    return ModeController(stats=stats, clock=clock)
+
+
+def test_idle_picks_full(controller):
+    assert controller.choose_tier() == ("full", "idle")
+
+
+def test_degrades_immediately_on_queue_depth(controller, stats):
+    stats.pending = 2
+    tier, reason = controller.choose_tier()
+    assert tier == "template"
+    assert reason.startswith("degraded: queue depth")
+
+
+def test_degrades_on_in_flight_crews(controller, stats):
+    stats.busy = 2
+    tier, reason = controller.choose_tier()
+    assert tier == "optimized"
+    assert reason == "degraded: 2 crew(s) in flight"
+
+
+def test_headroom_alone_degrades_full_to_optimized_to_template(controller):
+    tiers = [controller.choose_tier()[0] for _ in range(5)]
+    assert tiers == ["full", "full", "optimized", "optimized", "template"]
+
+
+def test_short_deadline_skips_full_crew(controller):
+    tier, reason = controller.choose_tier(remaining_seconds=5)
+    assert tier == "optimized"
+    assert "too short for full crew" in reason
+
+
+def test_status_reports_tier_actually_served(controller):
+    controller.choose_tier(remaining_seconds=5)
+    status = controller.status()
+    assert status["tier"] == "optimized"
+    assert status["load_tier"] == "full"
+
+
+def test_timeouts_feed_timeout_rate_not_latency(controller):
+    for _ in range(5):
+        controller.request_finished("optimized", 5.0, timed_out=True)
+    status = controller.status()
+    assert status["signals"]["p95_latency"] == 0.0
+    assert status["signals"]["timeout_rate"] == 1.0
+    assert status["timeouts"] == 5
+
+    tier, reason = controller.choose_tier()
+    assert tier == "template"
+    assert reason == "degraded: timeout rate 1.0"
+
+
+def test_latency_samples_age_out(controller, clock):
+    for _ in range(20):
+        controller.request_finished("optimized", 4.8)
+    assert controller.choose_tier() == ("template", "degraded: p95 latency 4.8s")
+
+    # No new crew samples arrive while serving templates, but old ones expire
+    clock.now += 120
+    tier, reason = controller.choose_tier()
+    assert tier == "full"
+    assert reason.startswith("recovered:")
+
+
+def test_idle_time_counts_towards_recovery(controller, clock, stats):
+    stats.pending = 2
+    assert controller.choose_tier()[0] == "template"
+
+    stats.pending = 0
+    clock.now += 3600
+    assert controller.choose_tier() == ("full", "recovered: idle")
+
+
+def test_busy_sample_restarts_cooldown(controller, clock, stats):
+    stats.pending = 2
+    assert controller.choose_tier()[0] == "template"
+
+    stats.pending = 0
+    clock.now += 10
+    assert controller.choose_tier() == ("template", "holding during cooldown")
+
+    # Still too busy to recover: the calm period starts over
+    clock.now += 15
+    stats.pending = 2
+    assert controller.choose_tier()[0] == "template"
+
+    stats.pending = 0
+    clock.now += TIER_COOLDOWN_SECONDS - 1
+    assert controller.choose_tier() == ("template", "holding during cooldown")
+
+    clock.now += 1
+    assert controller.choose_tier()[0] == "optimized"
+
+
+def test_recovers_one_tier_per_cooldown(controller, clock, stats):
+    stats.pending = 2
+    assert controller.choose_tier()[0] == "template"
+
+    stats.pending = 0
+    clock.now += TIER_COOLDOWN_SECONDS
+    tier, reason = controller.choose_tier()
+    assert tier == "optimized"
+    assert reason.startswith("recovered:")
+
+    clock.now += 1
+    assert controller.choose_tier() == ("optimized", "holding during cooldown")
+
+    clock.now += TIER_COOLDOWN_SECONDS
+    assert controller.choose_tier()[0] == "full"
+
+
+def test_pin_overrides_load_until_unpinned(controller, stats):
+    controller.pin("template")
+    assert controller.choose_tier() == ("template", "pinned by admin")
+    assert controller.status()["pinned"] == "template"
+    assert controller.status()["tier"] == "template"
+
+    stats.pending = 5
+    controller.pin("full")
+    assert controller.choose_tier() == ("full", "pinned by admin")
+
+    controller.pin(None)
+    assert controller.choose_tier()[0] == "template"
+
+
+def test_pin_rejects_unknown_tier(controller):
+    with pytest.raises(ValueError):
+        controller.pin("turbo")
@@ -0,0 +1,53 @@
+"""
+Tests for the tool lookups and budgeted tool calls
+Run from backend/: python -m pytest -q
+"""
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from deadline import RequestBudget
+from tools import (
+    ACTION_TOOL_NAME,
+    FAQ_TOOL_NAME,
+    ORDER_TOOL_NAME,
+    answer_from_tools,
+    create_tools,
+    partial_answer,
+)
+
+
+def test_tools_enforce_call_limit_and_record_results():
+    budget = RequestBudget(5, max_tool_calls=1)
+    tools = create_tools(budget)
+
+    first = tools["search_faq"]._run("shipping?")
+    assert "Standard shipping" in first
+    assert "limit reached" in tools["search_faq"]._run("shipping?")
+    # Refused calls aren't recorded
+    assert budget.tool_results_snapshot() == [(FAQ_TOOL_NAME, first)]
+
+
+def test_partial_answer_prefers_recorded_tool_output():
+    budget = RequestBudget(5)
+    budget.record_tool_result(ORDER_TOOL_NAME, "Order #12345 - Status: Shipped")
+    assert partial_answer("what's your shipping policy?", budget) == "Order #12345 - Status: Shipped"
+
+
+def test_partial_answer_skips_actions_and_misses():
+    budget = RequestBudget(5)
+    budget.record_tool_result(FAQ_TOOL_NAME, "FAQ Answer: We accept credit cards, debit cards, and PayPal.")
+    budget.record_tool_result(ORDER_TOOL_NAME, "Order #99999 not found in system. Please verify.")
+    budget.record_tool_result(ACTION_TOOL_NAME, "Action logged successfully: refund")
+    assert partial_answer("payment?", budget) == "We accept credit cards, debit cards, and PayPal."
+
+
+def test_partial_answer_falls_back_to_answer_from_tools():
+    budget = RequestBudget(5)
+    budget.record_tool_result(ACTION_TOOL_NAME, "Action logged successfully: refund")
+    assert partial_answer("where is order 12345?", budget) == answer_from_tools("where is order 12345?")
+
+
+def test_answer_from_tools_asks_for_missing_order_number():
+    assert "5-digit order number" in answer_from_tools("where is my order?")
@@ -3,8 +3,10 @@ Custom tools for the Customer Care Multi-Agent System
 These tools will be used by various agents to perform their tasks
 """
 
+import re
+from typing import Any, Optional, Type
+
 from crewai.tools import BaseTool
-from typing import Type
 from pydantic import BaseModel, Field
 
 # FAQ Database (from Lab 1)
@@ -21,48 +23,130 @@ ORDER_DATABASE = {
     "67890": {"status": "Processing", "tracking": None, "eta": "Feb 2, 2026"}
 }
 
+FAQ_TOOL_NAME = "FAQ Search Tool"
+ORDER_TOOL_NAME = "Order Lookup Tool"
+ACTION_TOOL_NAME = "Action Logger Tool"
+
+# ============================================================
+# Plain lookups (shared by the tools and the no-LLM fallbacks)
+# ============================================================
+
+def search_faq_text(query: str) -> str:
+    """Search the FAQ database and return the raw answer text"""
+    query_lower = query.lower()
+
+    # Check for return/returns
+    if "return" in query_lower:
+        return FAQ_DATABASE["returns"]
+
+    # Check other keywords
+    for key, answer in FAQ_DATABASE.items():
+        if key in query_lower:
+            return f"FAQ Answer: {answer}"
+
+    return "No FAQ match found. This may require further research or escalation."
+
+
+def lookup_order_text(order_number: str) -> str:
+    """Look up an order and return the raw status text"""
+    order_info = ORDER_DATABASE.get(order_number)
+
+    if order_info:
+        result = f"Order #{order_number} - Status: {order_info['status']}, ETA: {order_info['eta']}"
+        if order_info['tracking']:
+            result += f", Tracking: {order_info['tracking']}"
+        return result
+    else:
+        return f"Order #{order_number} not found in system. Please verify the order number or suggest customer contact support."
+
+
+def find_order_number(text: str) -> Optional[str]:
+    """Return the first 5-digit order number in the text, if any"""
+    match = re.search(r'\b\d{5}\b', text)
+    return match.group() if match else None
+
+
+def is_customer_answer(result: str) -> bool:
+    """True if a FAQ/order result can be shown to the customer as-is"""
+    return not (
+        result.startswith("No FAQ match")
+        or " not found in system" in result
+        or " limit reached " in result
+    )
+
+
+def answer_from_tools(user_message: str) -> str:
+    """
+    Deterministic answer straight from the lookups (no LLM needed!)
+    """
+    order_number = find_order_number(user_message)
+    if order_number:
+        return lookup_order_text(order_number)
+    if 'order' in user_message.lower():
+        return "Could you please share your 5-digit order number so I can look it up?"
+
+    answer = search_faq_text(user_message)
+    if not is_customer_answer(answer):
+        return "I don't have that information right now. Please contact support for more help."
+    return answer.removeprefix("FAQ Answer: ")
+
+
+def partial_answer(user_message: str, budget) -> str:
+    """
+    Best-effort answer when the deadline passes before the crew finishes
+
+    Uses the latest usable FAQ/order result the agents already fetched,
+    otherwise falls back to answer_from_tools().
+    """
+    for tool_name, result in reversed(budget.tool_results_snapshot()):
+        if tool_name in (FAQ_TOOL_NAME, ORDER_TOOL_NAME) and is_customer_answer(result):
+            return result.removeprefix("FAQ Answer: ")
+    return answer_from_tools(user_message)
+
+# ============================================================
+# Tools
+# ============================================================
+
+def run_budgeted(budget, tool_name: str, fn, *args) -> str:
+    """
+    Run a tool body under a request's budget
+
+    Refuses the call once the deadline passes or the tool's call limit is
+    reached, and records the result so it can serve as a partial answer.
+    """
+    if budget is None:
+        return fn(*args)
+    if not budget.allow_tool_call(tool_name):
+        return f"{tool_name} limit reached for this request. Answer with the information you already have."
+    result = fn(*args)
+    budget.record_tool_result(tool_name, result)
+    return result
+
 class FAQSearchInput(BaseModel):
     """Input for FAQ Search Tool"""
     query: str = Field(..., description="The user's question or keywords to search for")
 
 class FAQSearchTool(BaseTool):
-    name: str = "FAQ Search Tool"
+    name: str = FAQ_TOOL_NAME
     description: str = "Search the FAQ database for answers to common questions about shipping, returns, payments, or tracking."
     args_schema: Type[BaseModel] = FAQSearchInput
+    budget: Any = Field(default=None, exclude=True)  # RequestBudget of the owning request
 
     def _run(self, query: str) -> str:
-        query_lower = query.lower()
-        
-        # Check for return/returns
-        if "return" in query_lower:
-            return FAQ_DATABASE["returns"]
-        
-        # Check other keywords
-        for key, answer in FAQ_DATABASE.items():
-            if key in query_lower:
-                return f"FAQ Answer: {answer}"
-        
-        return "No FAQ match found. This may require further research or escalation."
+        return run_budgeted(self.budget, self.name, search_faq_text, query)
 
 class OrderLookupInput(BaseModel):
     """Input for Order Lookup Tool"""
     order_number: str = Field(..., description="The order number to look up (e.g., '12345')")
 
 class OrderLookupTool(BaseTool):
-    name: str = "Order Lookup Tool"
+    name: str = ORDER_TOOL_NAME
     description: str = "Look up order status, tracking information, and estimated delivery using the order number."
     args_schema: Type[BaseModel] = OrderLookupInput
+    budget: Any = Field(default=None, exclude=True)
 
     def _run(self, order_number: str) -> str:
-        order_info = ORDER_DATABASE.get(order_number)
-        
-        if order_info:
-            result = f"Order #{order_number} - Status: {order_info['status']}, ETA: {order_info['eta']}"
-            if order_info['tracking']:
-                result += f", Tracking: {order_info['tracking']}"
-            return result
-        else:
-            return f"Order #{order_number} not found in system. Please verify the order number or suggest customer contact support."
+        return run_budgeted(self.budget, self.name, lookup_order_text, order_number)
 
 class ActionLoggerInput(BaseModel):
     """Input for Action Logger Tool"""
@@ -70,20 +154,30 @@ class ActionLoggerInput(BaseModel):
     details: str = Field(..., description="Details about the action taken")
 
 class ActionLoggerTool(BaseTool):
-    name: str = "Action Logger Tool"
+    name: str = ACTION_TOOL_NAME
     description: str = "Log actions taken during the customer interaction such as refunds, escalations, or callbacks."
     args_schema: Type[BaseModel] = ActionLoggerInput
+    budget: Any = Field(default=None, exclude=True)
 
     def _run(self, action_type: str, details: str) -> str:
+        return run_budgeted(self.budget, self.name, self._log, action_type, details)
+
+    def _log(self, action_type: str, details: str) -> str:
         # In a real system, this would write to a database
         log_entry = f"[ACTION LOGGED] {action_type.upper()}: {details}"
         print(log_entry)  # For visibility during development
         return f"Action logged successfully: {action_type}"
 
-# Create tool instances
-search_faq = FAQSearchTool()
-lookup_order = OrderLookupTool()
-log_action = ActionLoggerTool()
 
-# Export all tools
-ALL_TOOLS = [search_faq, lookup_order, log_action]
+def create_tools(budget=None) -> dict:
+    """
+    Create tool instances bound to one request's budget
+
+    The budget is held by the tool itself (not a context variable) so the
+    limits still apply when CrewAI runs an agent in its own thread.
+    """
+    return {
+        "search_faq": FAQSearchTool(budget=budget),
+        "lookup_order": OrderLookupTool(budget=budget),
+        "log_action": ActionLoggerTool(budget=budget)
+    }